@@ -1,64 +1,207 @@
 #!/usr/bin/env python3
 """
-Flask TTS API (OGG output, ALWAYS new file per request, UUID filenames).
+Flask TTS API (OGG output, one file per distinct phrase + engine settings, content-id filenames).
 
 Engines:
   - pyttsx3 (offline, system voices)
   - gTTS (Google Translate TTS, no API key; requires internet)
+  - espeak-ng (offline, Linux; espeak-ng --stdout encoded in memory, or piped into ffmpeg; no temp files)
+  - Piper (offline ONNX neural voices via onnxruntime; samples encoded in memory, no temp files;
+    concurrent misses are batched into one padded model run)
 
-Filename format (no caching):
-  <uuid>_<username>_<action>.ogg
+Filename format:
+  <id>_<username>_<action>.ogg
+  id = blake2b-128 of (engine, phrase, voice/rate or lang/tld, encoding), so identical requests
+  get the same URL and an existing file is returned without rendering anything. The URL names
+  the exact bytes, which is what makes the immutable caching below safe.
 
 HTTP:
   GET /api/tts?username=<str>&action=<join|leave>
       [&base_url=<http(s)://host:port>]
-      [&engine=<pyttsx3|gtts>]
+      [&engine=<pyttsx3|gtts>]   (unknown values: the server's --engine; piper only if loaded)
       [&lang=<gtts lang code>]
       [&tld=<gtts tld>]
+      [&wait=0]
   → RETURNS PLAIN TEXT: "<absolute URL to .ogg file>"
+    (under /static/audio/, or /media/ when --accel-redirect-prefix / --x-sendfile is set)
+    With wait=0 a cold render doesn't block: if it isn't done within 0.5s the URL comes back with
+    202 and the file appears there when rendering finishes (poll it). Default is to wait and
+    answer 200.
+
+  GET /media/<file>.ogg
+  → Hands the file to the front proxy instead of streaming it from Python:
+    X-Accel-Redirect: <prefix><file> (nginx) or X-Sendfile (Apache mod_xsendfile).
 
   GET /api/voices
   → If engine=pyttsx3: JSON list of system voices (index/id/name/languages)
     If engine=gtts: JSON of available languages and current tld
+    If engine=espeak-ng: JSON list of installed espeak-ng voices
+    If engine=piper: JSON with the loaded model, its language and sample rate
+
+Encoding:
+  OGG/Vorbis, mono, quality 0 (~64 kbps VBR); plenty for speech. soundfile encodes in-process
+  at the source rate (TTS output is <= 24 kHz); the ffmpeg fallback resamples to 22.05 kHz.
+
+Phrase cache:
+  Rendered audio is kept as canonical files phrase_cache/audio/<blake2b>.ogg (LRU, 256 entries),
+  keyed on (phrase, voice, rate) for pyttsx3 or (phrase, lang, tld) for gTTS. A hit hardlinks
+  the canonical to the requested filename (copy if linking fails) and skips synthesis/encoding
+  entirely. Canonicals persist across restarts. The dir sits next to static/, not inside it, so
+  canonicals can't be fetched or listed over HTTP; same filesystem, so hardlinks work.
+
+Scratch files:
+  pyttsx3's drivers can only write to a file, so its intermediate WAV goes to /dev/shm/reso-tts
+  when available (tmpfs, RAM only), else <system temp>/reso-tts; static/audio only as a last
+  resort. A background janitor deletes scratch files older than 30s once a minute, so requests
+  never wait on the unlink. gTTS MP3 stays in memory and is piped through a single ffmpeg
+  (or decoded in-process by soundfile when it supports MP3).
+
+Client caching:
+  Audio responses (/static/audio/*.ogg, /media/*.ogg) carry
+  "Cache-Control: public, max-age=31536000, immutable" and a strong ETag (the file's
+  content id); a matching If-None-Match gets 304.
+  /api/tts answers carry "Cache-Control: private, no-cache" and an ETag of the URL text:
+  clients revalidate every reuse (304 while the file exists), so a URL whose file was cleaned
+  up is never handed out from a cache; the request reaches the app, which re-renders it.
+
+Proxy offload (nginx), run with --accel-redirect-prefix /_protected_audio/:
+  location /_protected_audio/ {
+      internal;
+      alias /path/to/project/static/audio/;
+  }
+  nginx then serves the bytes with sendfile(2); Flask only emits headers.
+
+  Or keep /api/tts on its default /static/audio/ URLs and let nginx answer those directly,
+  so Flask never sees audio requests at all:
+  location /static/audio/ {
+      alias /path/to/project/static/audio/;
+      sendfile on;
+      expires 1y;
+      add_header Cache-Control "public, max-age=31536000, immutable";
+  }
 
 Cleanup:
   After each generate, keep only the newest X .ogg files in static/audio.
-  X is controlled by --max-files (default: 50).
+  X is controlled by --max-files (default: 50); --max-age-minutes additionally drops old ones.
 
 CLI examples:
   # gTTS (free, no key)
   python main.py --engine gtts --gtts-lang en --gtts-tld com
 
+  # espeak-ng, female variant
+  python main.py --engine espeak-ng --espeak-voice en-us+f3
+
+  # Piper neural voice
+  python main.py --engine piper --piper-model voices/en_US-amy-low.onnx
+
   # pyttsx3 with specific voice index
   python main.py --engine pyttsx3 --tts-voice-index 28
 
+  # pyttsx3 rendering across 4 worker processes
+  python main.py --synth-processes 4
+
+  # pyttsx3 with 2 in-process engines (2 concurrent renders; Windows/SAPI5 only)
+  python main.py --tts-workers 2
+
   # keep only the newest 20 files
   python main.py --max-files 20
+
+  # pre-render join/leave clips for known users (JSON list of names)
+  python main.py --prewarm-users users.json
+  python main.py --prewarm-users users.txt   # one name per line
+  PRELOAD_USERNAMES="$(cat users.txt)" python main.py   # same, from the environment
+
+  # behind nginx, let it stream the audio files
+  python main.py --accel-redirect-prefix /_protected_audio/
+
+  # production: gunicorn, 4 workers x 8 threads (pip install gunicorn; Linux/macOS)
+  python main.py --production --workers 4 --threads 8
+  # on Windows (no gunicorn) --production uses waitress instead: one process, --threads threads
 """
 
 from __future__ import annotations
-import os, re, threading, argparse, json, uuid
-from typing import Final, Literal, Optional, Tuple, List, Any
+import os, sys, re, io, time, queue, base64, shutil, threading, argparse, json, secrets, hashlib, multiprocessing, subprocess, tempfile, wave
+import importlib.util
+import urllib.request
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from typing import Final, Literal, Optional, Tuple, List, Any, ContextManager, Iterator
 from urllib.parse import urljoin
-from flask import Flask, jsonify, request, url_for, abort, Response
+from flask import Flask, request, abort, Response, send_from_directory
 import pyttsx3
-from pydub import AudioSegment
 
 # gTTS bits
 try:
-    from gtts import gTTS
+    from gtts import gTTS, gTTSError
     from gtts.lang import tts_langs as gtts_langs
+    import requests  # gTTS dependency; we reuse its transport with a keep-alive session
 except Exception:
     gTTS = None
+    gTTSError = None
     gtts_langs = None  # We'll guard usage below.
+    requests = None
+
+# soundfile (libsndfile/libvorbis, in-process). Without it we fall back to an ffmpeg subprocess.
+try:
+    import soundfile as sf
+    _SF_FORMATS = frozenset(sf.available_formats())
+except Exception:
+    sf = None
+    _SF_FORMATS = frozenset()
+
+# Piper (ONNX VITS voices via onnxruntime, offline). Optional.
+try:
+    from piper import PiperVoice
+    from piper.config import PiperConfig
+    import onnxruntime
+    import numpy as np
+except Exception:
+    PiperVoice = None
+    PiperConfig = None
+    onnxruntime = None
+    np = None
+
+# orjson (C JSON encoder). Optional; the stdlib json does the same job a bit slower.
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 Action = Literal["join", "leave"]
-EngineName = Literal["pyttsx3", "gtts"]
+_ACTIONS: Final[frozenset] = frozenset(("join", "leave"))
+EngineName = Literal["pyttsx3", "gtts", "espeak-ng", "piper"]
+
+# Output encoding: speech only, so mono 22.05 kHz Vorbis at quality 0 (~64 kbps VBR) is plenty.
+OGG_CHANNELS: Final[int] = 1
+OGG_SAMPLE_RATE: Final[int] = 22050
+VORBIS_QUALITY: Final[int] = 0  # ffmpeg -q:a scale, -1..10
+FFMPEG_VORBIS_ARGS: Final[List[str]] = [
+    "-ac", str(OGG_CHANNELS), "-ar", str(OGG_SAMPLE_RATE), "-c:a", "libvorbis", "-q:a", str(VORBIS_QUALITY),
+]
+# Part of every content id / phrase-cache key: changing the encoding changes the bytes, so it must
+# change the filename too, or clients holding the old file as "immutable" would never refetch.
+AUDIO_FORMAT_TAG: Final[str] = f"vorbis-q{VORBIS_QUALITY}-ch{OGG_CHANNELS}"
+
+# Generated files never change once written (name = content id), so clients may keep them for a year.
+AUDIO_MAX_AGE: Final[int] = 31536000
+# The URL for a request is stable too, but cleanup may delete the file behind it and only an
+# /api/tts call that reaches the app re-renders it. So answers may be stored but must be revalidated
+# on every reuse (If-None-Match -> 304 when the file is still there).
+TTS_URL_CACHE_CONTROL: Final[str] = "private, no-cache"
+# How stale the in-memory view of audio_dir may get before its mtime is checked for outside changes.
+PRESENT_RECHECK_S: Final[float] = 1.0
+# /api/tts bodies kept per (engine key, base, username, action); each hit is re-checked against the disk set.
+TTS_RESPONSE_CACHE_SIZE: Final[int] = 8192
+# wait=0 still waits this long for the render before falling back to 202.
+ASYNC_GRACE_S: Final[float] = 0.5
 
 
 # ---------- CLI PARSER ----------
 
-def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, str, int]:
+def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, str, int, str, str, bool, int, float, str, Optional[int], str, bool, int, int]:
     parser = argparse.ArgumentParser(description="Start the TTS Flask server.")
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=4684, help="Port to bind (default: 4684)")
@@ -72,7 +215,7 @@ def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, st
     # Engine selection
     parser.add_argument(
         "--engine",
-        choices=["pyttsx3", "gtts"],
+        choices=["pyttsx3", "gtts", "espeak-ng", "piper"],
         default="pyttsx3",
         help="TTS engine to use (default: pyttsx3)."
     )
@@ -91,6 +234,21 @@ def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, st
         default=None,
         help="(pyttsx3) Pick a voice by numeric index."
     )
+    parser.add_argument(
+        "--synth-processes",
+        dest="synth_processes",
+        type=int,
+        default=0,
+        help="(pyttsx3) Render in N worker processes, one engine each (default: 0 = in-process)."
+    )
+    parser.add_argument(
+        "--tts-workers",
+        dest="tts_workers",
+        type=int,
+        default=None,
+        help="(pyttsx3) Size of the in-process engine pool, i.e. concurrent renders (default: 1). "
+             "Windows/SAPI5 only; on espeak use --synth-processes."
+    )
 
     # gTTS options
     parser.add_argument(
@@ -106,6 +264,22 @@ def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, st
         help="(gTTS) Accent domain like 'com', 'co.uk', 'com.au' (default: com)."
     )
 
+    # espeak-ng options
+    parser.add_argument(
+        "--espeak-voice",
+        dest="espeak_voice",
+        default="en-us",
+        help="(espeak-ng) Voice, optionally with variant, e.g. 'en-us+f3' (default: en-us)."
+    )
+
+    # Piper options
+    parser.add_argument(
+        "--piper-model",
+        dest="piper_model",
+        default="",
+        help="(piper) Path to an ONNX voice, e.g. en_US-amy-low.onnx (its .onnx.json must sit next to it)."
+    )
+
     # Cleanup options
     parser.add_argument(
         "--max-files",
@@ -114,6 +288,57 @@ def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, st
         default=50,
         help="Maximum number of .ogg files to keep in static/audio (default: 50)."
     )
+    parser.add_argument(
+        "--max-age-minutes",
+        dest="max_age_minutes",
+        type=float,
+        default=0,
+        help="Also delete generated .ogg files older than this many minutes (default: 0 = no age limit). "
+             "Phrase-cache canonicals are never touched."
+    )
+
+    # Cache warm-up
+    parser.add_argument(
+        "--prewarm-users",
+        dest="prewarm_users",
+        default="",
+        help="Optional file of usernames (JSON list, or plain text with one name per line); "
+             "join/leave audio for each is rendered into the phrase cache at startup."
+    )
+
+    # Static offload to a front proxy
+    parser.add_argument(
+        "--accel-redirect-prefix",
+        dest="accel_redirect_prefix",
+        default="",
+        help="nginx internal location for static/audio (e.g. /_protected_audio/). "
+             "Returned URLs point at /media/ and the file is served via X-Accel-Redirect."
+    )
+    parser.add_argument(
+        "--x-sendfile",
+        dest="x_sendfile",
+        action="store_true",
+        help="Serve /media/ files via X-Sendfile (Apache mod_xsendfile)."
+    )
+
+    # Serving
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Serve with gunicorn (gthread workers) instead of Flask's development server."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="(--production) gunicorn worker processes, each with its own TTS engine (default: 2)."
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=8,
+        help="(--production) request threads per worker (default: 8)."
+    )
 
     args = parser.parse_args()
     return (
@@ -126,51 +351,295 @@ def parse_args() -> Tuple[str, int, str, EngineName, str, Optional[int], str, st
         args.gtts_lang.strip(),
         args.gtts_tld.strip(),
         int(args.max_files) if args.max_files and args.max_files > 0 else 50,
+        args.prewarm_users.strip(),
+        args.accel_redirect_prefix.strip(),
+        bool(args.x_sendfile),
+        max(0, int(args.synth_processes or 0)),
+        max(0.0, float(args.max_age_minutes or 0)),
+        args.espeak_voice.strip(),
+        args.tts_workers,
+        args.piper_model.strip(),
+        bool(args.production),
+        max(1, int(args.workers or 1)),
+        max(1, int(args.threads or 1)),
     )
 
 
 # ---------- UTILITIES ----------
 
+# Dirs already confirmed to exist; repeat calls skip the stat entirely.
+_ensured_dirs: set = set()
+
 def ensure_dir(path: str) -> None:
-    if path and not os.path.exists(path):
+    if not path or path in _ensured_dirs:
+        return
+    if not os.path.exists(path):
         os.makedirs(path, exist_ok=True)
+    _ensured_dirs.add(path)
 
-def ensure_parent_dir(path: str) -> None:
-    parent = os.path.dirname(path)
-    if parent:
-        ensure_dir(parent)
-
+@lru_cache(maxsize=1)
 def project_paths() -> Tuple[str, str]:
     root = os.path.dirname(os.path.abspath(__file__))
     audio_dir = os.path.join(root, "static", "audio")
     ensure_dir(audio_dir)
     return root, audio_dir
 
+def scratch_dir(fallback: str) -> str:
+    """Dir for short-lived intermediates (pyttsx3 WAV).
+
+    Prefers tmpfs (/dev/shm) so they never touch a real disk, then the OS temp dir (often tmpfs
+    too, and at least outside the served static folder), then `fallback`.
+    """
+    for base in ("/dev/shm", tempfile.gettempdir()):
+        if not (os.path.isdir(base) and os.access(base, os.W_OK)):
+            continue
+        path = os.path.join(base, "reso-tts")
+        try:
+            ensure_dir(path)
+            return path
+        except Exception as e:
+            print(f"[scratch] Cannot use {path}: {e}")
+    return fallback
+
+def sweep_scratch(tmp_dir: str, max_age_s: float = 30) -> None:
+    """Delete `.tmp_*` scratch files older than `max_age_s`."""
+    cutoff = time.time() - max_age_s
+    try:
+        with os.scandir(tmp_dir) as it:
+            for e in it:
+                if not e.name.startswith(".tmp_"):
+                    continue
+                try:
+                    if e.stat().st_mtime < cutoff:
+                        os.unlink(e.path)
+                except FileNotFoundError:
+                    continue
+                except Exception as ex:
+                    print(f"[janitor] Failed to delete {e.path}: {ex}")
+    except Exception as ex:
+        print(f"[janitor] Error sweeping {tmp_dir}: {ex}")
+
+_janitors: set = set()
+
+def start_scratch_janitor(tmp_dir: str, interval_s: float = 60, max_age_s: float = 30) -> None:
+    """Daemon thread that batch-deletes stale scratch files, once per dir per process."""
+    if tmp_dir in _janitors:
+        return
+    _janitors.add(tmp_dir)
+
+    def loop() -> None:
+        while True:
+            time.sleep(interval_s)
+            sweep_scratch(tmp_dir, max_age_s)
+
+    threading.Thread(target=loop, name="scratch-janitor", daemon=True).start()
+
+_SANITIZE_ALLOWED = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_-")
+# Byte -> itself if allowed, else "-". bytes.translate with a 256-byte table is a straight C loop.
+_SANITIZE_TABLE = bytes(c if chr(c) in _SANITIZE_ALLOWED else ord("-") for c in range(256))
+_RE_NONALNUM = re.compile(r"[^a-z0-9_\-]+")
+_RE_DUP_DASH = re.compile(r"-{2,}")
+
+@lru_cache(maxsize=4096)
 def sanitize_username(username: str, max_len: int = 64) -> str:
     s = username.strip().lower()
-    s = re.sub(r"[^a-z0-9_\-]+", "-", s)
-    s = re.sub(r"-{2,}", "-", s).strip("-")
+    if s.isascii():
+        s = s.encode("ascii").translate(_SANITIZE_TABLE).decode("ascii")
+    else:
+        s = _RE_NONALNUM.sub("-", s)
+    if "--" in s:
+        s = _RE_DUP_DASH.sub("-", s)
+    s = s.strip("-")
     return s[:max_len] or "user"
 
+@lru_cache(maxsize=4096)
 def build_phrase(username: str, action: Action) -> str:
     #return f"{username} has joined the session." if action == "join" else f"{username} has left the session."
     return f"Welcome, {username}" if action == "join" else f"Goodbye, {username}"
     
 
+@lru_cache(maxsize=64)
 def is_valid_base_url(value: str) -> bool:
     if not value:
         return False
     v = value.strip().lower()
     return v.startswith("http://") or v.startswith("https://")
 
-def build_file_url(app: Flask, rel_static_path: str, base_url_override: Optional[str]) -> str:
-    static_path = f"/static/{rel_static_path.lstrip('/')}"
-    if base_url_override and is_valid_base_url(base_url_override):
-        return urljoin(base_url_override.rstrip('/') + '/', static_path.lstrip('/'))
-    return url_for("static", filename=rel_static_path.replace("\\", "/"), _external=True)
+def build_file_url(app: Flask, rel_static_path: str, base_url_override: Optional[str], endpoint: str = "static",
+                   base_valid: Optional[bool] = None) -> str:
+    """`base_valid` lets callers pass a validity computed up front (e.g. for the configured base URL)."""
+    rel = rel_static_path.replace("\\", "/").lstrip("/")
+    if base_valid is None:
+        base_valid = bool(base_url_override) and is_valid_base_url(base_url_override)
+    if base_url_override and base_valid:
+        return urljoin(base_url_override.rstrip('/') + '/', f"{endpoint}/{rel}")
+    # Same result as url_for(endpoint, filename=rel, _external=True) for our two flat routes
+    # (/static/<path>, /media/<name>), without the URL-map build on every request.
+    return f"{request.url_root}{endpoint}/{rel}"
+
+@lru_cache(maxsize=1)
+def gtts_language_table() -> dict:
+    """gTTS's language map; static per gTTS install, so fetch it once."""
+    return dict(gtts_langs()) if gtts_langs else {}
+
+# gTTS opens a fresh TCP+TLS connection per call. gTTS has no hook for passing a session in, so
+# gtts_fetch sends its prepared requests itself over a keep-alive session, one per thread
+# (requests.Session isn't guaranteed thread-safe).
+_gtts_local = threading.local()
+_GTTS_AUDIO_RE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+def gtts_fetch(phrase: str, lang: str, tld: str) -> bytes:
+    """MP3 bytes for `phrase`, sent over this thread's keep-alive session.
+
+    Mirrors gTTS.stream(), including its gTTSError on HTTP, transport and parse failures.
+    """
+    tts = gTTS(text=phrase, lang=lang, tld=tld, slow=False, lang_check=False)
+    prepare = getattr(tts, "_prepare_requests", None)
+    if prepare is None or requests is None:
+        # gTTS internals moved; fall back to its own (per-call connection) transport.
+        buf = io.BytesIO()
+        tts.write_to_fp(buf)
+        return buf.getvalue()
+
+    session = getattr(_gtts_local, "session", None)
+    if session is None:
+        session = _gtts_local.session = requests.Session()
+
+    out = bytearray()
+    for pr in prepare():
+        r = None
+        try:
+            r = session.send(pr, proxies=urllib.request.getproxies(), timeout=tts.timeout)
+            r.raise_for_status()
+        except requests.exceptions.HTTPError:
+            raise gTTSError(tts=tts, response=r)
+        except requests.exceptions.RequestException:
+            raise gTTSError(tts=tts)
+        for line in r.iter_lines(chunk_size=1024):
+            decoded = line.decode("utf-8")
+            if "jQ1olc" in decoded:
+                m = _GTTS_AUDIO_RE.search(decoded)
+                if not m:
+                    raise gTTSError(tts=tts, response=r)
+                out += base64.b64decode(m.group(1).encode("ascii"))
+    if not out:
+        raise gTTSError(tts=tts)
+    return bytes(out)
+
+def audio_etag(filename: str) -> Optional[str]:
+    """Strong ETag for a generated file: its content id (the filename prefix), so no stat is needed.
+
+    mtime would not do: restores and reuse bump it on files whose bytes never change.
+    """
+    uid = filename.split("_", 1)[0]
+    return uid if len(uid) == 32 else None
+
+@contextmanager
+def atomic_output(path: str) -> Iterator[str]:
+    """Yield a sibling temp path; on success it replaces `path`, so readers never see a partial file."""
+    part = f"{path}.{secrets.token_hex(4)}.part"
+    try:
+        yield part
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            try:
+                os.remove(part)
+            except Exception:
+                pass
+
+def render_key_bytes(key: tuple) -> bytes:
+    """The one serialization of a render key (plus output encoding) that ids and digests hash.
+
+    repr() quotes and escapes every field, so user-supplied text (phrase, tld) can't make two
+    different keys serialize alike, as a plain separator join could.
+    """
+    return repr((key, AUDIO_FORMAT_TAG)).encode("utf-8")
+
+def content_id(key: tuple) -> str:
+    """Stable 32-hex id for everything that shapes a render; equal inputs -> equal filenames."""
+    return hashlib.blake2b(render_key_bytes(key), digest_size=16).hexdigest()
+
+def write_vorbis(samples: Any, sr: int, ogg_path: str) -> None:
+    """soundfile path: downmix to mono, then encode Vorbis at the lowest-bitrate setting."""
+    if getattr(samples, "ndim", 1) > 1 and samples.shape[1] > 1:
+        samples = samples.mean(axis=1).astype(samples.dtype)
+    # libsndfile maps compression_level 1.0 to Vorbis quality 0 (same as ffmpeg -q:a 0).
+    # TTS output is already <= 24 kHz, so no resample here; the ffmpeg paths pin 22.05 kHz.
+    with atomic_output(ogg_path) as out:
+        sf.write(out, samples, sr, format="OGG", subtype="VORBIS", compression_level=1.0)
+
+def encode_ogg(src_path: str, ogg_path: str, src_format: str = "wav") -> None:
+    """Transcode `src_path` to OGG/Vorbis; in-process via soundfile when it can read the source format."""
+    if sf is not None and src_format.upper() in _SF_FORMATS and "OGG" in _SF_FORMATS:
+        data, sr = sf.read(src_path, dtype="int16")
+        write_vorbis(data, sr, ogg_path)
+        return
+    with open(src_path, "rb") as f:
+        ffmpeg_pipe_to_ogg(f.read(), ogg_path)
+
+def json_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, indent=2 if pretty else None, ensure_ascii=False).encode("utf-8")
+
+def load_usernames(path: str) -> List[str]:
+    """Read usernames from a JSON list, or from plain text with one name per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith(".json"):
+        data = json.loads(text)
+        if not isinstance(data, list):
+            raise ValueError(f"{path}: expected a JSON list of usernames")
+    else:
+        data = text.splitlines()
+    return [str(u).strip() for u in data if str(u).strip()]
+
+def ffmpeg_pipe_to_ogg(data: bytes, ogg_path: str) -> None:
+    """One ffmpeg process, stdin -> stdout, no temp files. Output is only written on success."""
+    proc = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", *FFMPEG_VORBIS_ARGS, "-f", "ogg", "pipe:1"],
+        input=data,
+        capture_output=True,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode('utf-8', 'replace').strip()}")
+    with atomic_output(ogg_path) as out, open(out, "wb") as f:
+        f.write(proc.stdout)
+
+def encode_ogg_bytes(data: bytes, ogg_path: str, src_format: str) -> None:
+    """Like encode_ogg, for audio already in memory."""
+    if sf is not None and src_format.upper() in _SF_FORMATS and "OGG" in _SF_FORMATS:
+        samples, sr = sf.read(io.BytesIO(data), dtype="int16")
+        write_vorbis(samples, sr, ogg_path)
+        return
+    ffmpeg_pipe_to_ogg(data, ogg_path)
+
+def reuse_existing(path: str) -> bool:
+    """True if `path` already exists; bumps its mtime so mtime-based cleanup keeps it a while longer."""
+    try:
+        os.utime(path, None)
+        return True
+    except FileNotFoundError:
+        return False
 
-def cleanup_audio_dir(audio_dir: str, max_files: int) -> None:
-    """Keep only the newest `max_files` .ogg files; delete older ones."""
+def link_or_copy(src: str, dst: str) -> None:
+    """Hardlink `src` as `dst` (no data moved); copy where a link isn't possible (EXDEV, FAT, ...)."""
+    try:
+        os.link(src, dst)
+    except (FileNotFoundError, FileExistsError):
+        raise
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def cleanup_audio_dir(audio_dir: str, max_files: int, max_age_s: float = 0) -> List[str]:
+    """Keep only the newest `max_files` .ogg files (and, if set, none older than `max_age_s`).
+
+    Only top-level files are considered.
+    Returns the paths that were deleted.
+    """
+    removed: List[str] = []
     try:
         entries = []
         for name in os.listdir(audio_dir):
@@ -187,53 +656,186 @@ def cleanup_audio_dir(audio_dir: str, max_files: int) -> None:
         # Sort newest first by mtime
         entries.sort(key=lambda t: t[0], reverse=True)
 
-        # Delete beyond the cap
-        for _, path in entries[max_files:]:
+        # Delete beyond the cap, plus anything past the age limit
+        cutoff = time.time() - max_age_s if max_age_s > 0 else None
+        doomed = entries[max_files:] + [e for e in entries[:max_files] if cutoff is not None and e[0] < cutoff]
+        for _, path in doomed:
             try:
                 os.remove(path)
+                removed.append(path)
             except Exception as e:
                 print(f"[cleanup] Failed to delete {path}: {e}")
     except Exception as e:
         print(f"[cleanup] Error cleaning audio dir: {e}")
+    return removed
 
 
 # ---------- CORE CLASSES ----------
 
-class AudioSpec:
-    def __init__(self, username_raw: str, action: Action, audio_dir: str):
-        if action not in ("join", "leave"):
-            raise ValueError("action must be 'join' or 'leave'")
-        self.username_raw = username_raw
-        self.action = action
-        self.audio_dir = audio_dir
-        self._uuid = str(uuid.uuid4())
+class PhraseCache:
+    """LRU of rendered .ogg files keyed on everything that shapes the audio (engine, phrase, voice, ...).
 
-    @property
-    def username_safe(self) -> str:
-        return sanitize_username(self.username_raw)
+    Entries are canonical files <canon_dir>/<blake2b(key)>.ogg. A hit hardlinks the canonical
+    to the requested name, so repeat phrases move no audio bytes. Canonicals outlive restarts and
+    are adopted again the first time the directory is used; the cap grows to cover all of them.
+    """
+    CANON_ROOT: Final[str] = "phrase_cache"
+    LEGACY_SUBDIR: Final[str] = "_canon"  # older layout: inside audio_dir, i.e. publicly served
 
-    @property
-    def filename(self) -> str:
-        return f"{self._uuid}_{self.username_safe}_{self.action}.ogg"
+    def __init__(self, audio_dir: str, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.canon_dir = self.canon_dir_for(audio_dir)
+        self._entries: "OrderedDict[str, str]" = OrderedDict()  # digest -> canonical path
+        self._lock = threading.Lock()
+        ensure_dir(self.canon_dir)
+        self._move_legacy(os.path.join(audio_dir, self.LEGACY_SUBDIR))
+        self._adopt_existing()
+
+    @classmethod
+    def canon_dir_for(cls, audio_dir: str) -> str:
+        """<root>/phrase_cache/<name> for <root>/static/<name>: beside the served static folder,
+        never inside it, and on the same filesystem so hardlinks still work."""
+        audio_dir = os.path.abspath(audio_dir)
+        static_root = os.path.dirname(audio_dir)
+        return os.path.join(os.path.dirname(static_root), cls.CANON_ROOT, os.path.basename(audio_dir))
+
+    def _move_legacy(self, legacy_dir: str) -> None:
+        try:
+            names = os.listdir(legacy_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            try:
+                os.replace(os.path.join(legacy_dir, name), os.path.join(self.canon_dir, name))
+            except OSError as e:
+                print(f"[cache] Failed to move {name} out of {legacy_dir}: {e}")
+        try:
+            os.rmdir(legacy_dir)
+        except OSError:
+            pass
 
-    @property
-    def ogg_path(self) -> str:
-        return os.path.join(self.audio_dir, self.filename)
+    @staticmethod
+    def digest(key: tuple) -> str:
+        return content_id(key)
 
-    @property
-    def tmp_wav_path(self) -> str:
-        return os.path.join(self.audio_dir, f".tmp_{self._uuid}.wav")
+    def _adopt_existing(self) -> None:
+        found = []
+        try:
+            for e in os.scandir(self.canon_dir):
+                if e.name.endswith(".ogg"):
+                    try:
+                        found.append((e.stat().st_mtime, e.name[:-4], e.path))
+                    except OSError:
+                        continue
+        except Exception as e:
+            print(f"[cache] Failed to scan {self.canon_dir}: {e}")
+        found.sort()  # oldest first == least recently used first
+        with self._lock:
+            for _, digest, path in found:
+                self._entries[digest] = path
+            # No eviction here: a larger set on disk was sized by an earlier reserve() (e.g. a prewarm
+            # run before the gunicorn workers started), which this process hasn't seen. Keep it all.
+            self.max_entries = max(self.max_entries, len(self._entries))
+
+    def _evict(self) -> None:
+        # Caller holds self._lock.
+        while len(self._entries) > self.max_entries:
+            _, path = self._entries.popitem(last=False)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"[cache] Failed to evict {path}: {e}")
 
-    @property
-    def tmp_mp3_path(self) -> str:
-        return os.path.join(self.audio_dir, f".tmp_{self._uuid}.mp3")
+    def reserve(self, entries: int) -> None:
+        """Grow the cap so `entries` prewarmed phrases aren't evicted by each other."""
+        with self._lock:
+            self.max_entries = max(self.max_entries, entries)
 
-    @property
-    def phrase(self) -> str:
-        return build_phrase(self.username_raw, self.action)
+    def restore(self, key: tuple, dest_path: str) -> bool:
+        """Materialize the cached audio for `key` at `dest_path`. Returns False on a miss."""
+        digest = self.digest(key)
+        with self._lock:
+            canon = self._entries.get(digest)
+            if canon is None:
+                return False
+            self._entries.move_to_end(digest)
+        try:
+            link_or_copy(canon, dest_path)
+        except FileExistsError:
+            pass  # Someone materialized it first; same content.
+        except FileNotFoundError:
+            # Evicted (or deleted by hand) between lookup and link.
+            with self._lock:
+                self._entries.pop(digest, None)
+            return False
+        # Links share the inode; bump its mtime so mtime-based cleanup treats the new name as fresh.
+        try:
+            os.utime(dest_path, None)
+        except OSError:
+            pass
+        return True
+
+    def store(self, key: tuple, src_path: str) -> None:
+        digest = self.digest(key)
+        canon = os.path.join(self.canon_dir, f"{digest}.ogg")
+        try:
+            link_or_copy(src_path, canon)
+        except FileExistsError:
+            pass  # Another request rendered the same phrase first.
+        except Exception as e:
+            print(f"[cache] Failed to store {src_path}: {e}")
+            return
+        with self._lock:
+            self._entries[digest] = canon
+            self._entries.move_to_end(digest)
+            self._evict()
+
+
+_phrase_caches: dict = {}
+_phrase_caches_lock = threading.Lock()
+
+def phrase_cache(audio_dir: str) -> PhraseCache:
+    """The process-wide PhraseCache for `audio_dir`, shared by every engine instance."""
+    with _phrase_caches_lock:
+        cache = _phrase_caches.get(audio_dir)
+        if cache is None:
+            cache = _phrase_caches[audio_dir] = PhraseCache(audio_dir)
+        return cache
+
+
+def audio_filename(uid: str, username_raw: str, action: str) -> str:
+    return f"{uid}_{sanitize_username(username_raw)}_{action}.ogg"
+
+
+class AudioSpec:
+    """Everything one render needs, derived once up front (read several times per request)."""
+    __slots__ = ("username_raw", "action", "audio_dir", "tmp_dir", "uid", "username_safe",
+                 "filename", "ogg_path", "tmp_wav_path", "phrase")
+
+    def __init__(self, username_raw: str, action: Action, audio_dir: str, tmp_dir: Optional[str] = None,
+                 uid: Optional[str] = None):
+        # `action` is validated by the caller (AudioService._resolve, before the content id is derived).
+        self.username_raw = username_raw
+        self.action = action
+        self.audio_dir = audio_dir
+        self.tmp_dir = tmp_dir or audio_dir
+        # Callers pass content_id(...) for deduplicated names; otherwise 128 random bits.
+        self.uid = uid or secrets.token_hex(16)
+        self.username_safe = sanitize_username(username_raw)
+        self.filename = audio_filename(self.uid, username_raw, action)
+        self.ogg_path = os.path.join(audio_dir, self.filename)
+        # Always random: concurrent renders of the same uid must not share a scratch file.
+        self.tmp_wav_path = os.path.join(self.tmp_dir, f".tmp_{secrets.token_hex(16)}.wav")
+        self.phrase = build_phrase(username_raw, action)
 
 
 class BaseTTS:
+    def cache_key(self, phrase: str) -> tuple:
+        """Everything that shapes the rendered audio for `phrase` (engine name first)."""
+        raise NotImplementedError
+
     def list_voices(self) -> List[dict]:
         return []
 
@@ -241,47 +843,148 @@ class BaseTTS:
         raise NotImplementedError
 
 
-class PyTTSX3Generator(BaseTTS):
-    """pyttsx3 (offline)"""
-    def __init__(self, prefer_voice_substr: str = "", voice_index: Optional[int] = None, rate_delta: int = -20):
-        self._engine = pyttsx3.init()
-        self._lock = threading.Lock()
+# pyttsx3 drivers whose engines share no process-global state, so several can render side by side.
+_POOLABLE_PYTTSX3_DRIVERS: Final[frozenset] = frozenset(("sapi5",))
 
-        try:
-            voices: List[Any] = self._engine.getProperty("voices") or []
-            chosen_id = None
+def pyttsx3_driver_name(engine: Any) -> str:
+    """Short driver name ("sapi5", "espeak", "nsss") of a pyttsx3 engine, or "" if it can't be told."""
+    try:
+        return engine.proxy._module.__name__.rsplit(".", 1)[-1]
+    except Exception:
+        return ""
 
-            if voice_index is not None:
-                if 0 <= voice_index < len(voices):
-                    chosen_id = getattr(voices[voice_index], "id", None)
-                    print(f"[pyttsx3] Using voice index {voice_index}: {chosen_id}")
-                else:
-                    print(f"[pyttsx3] Voice index {voice_index} out of range (0..{len(voices)-1}). Ignoring.")
-
-            if chosen_id is None and prefer_voice_substr:
-                needle = prefer_voice_substr.lower()
-                for v in voices:
-                    vid = (getattr(v, "id", "") or "").lower()
-                    vname = (getattr(v, "name", "") or "").lower()
-                    if needle in vid or needle in vname:
-                        chosen_id = v.id
-                        print(f"[pyttsx3] Using voice by substring '{prefer_voice_substr}': {chosen_id}")
-                        break
 
-            if chosen_id:
-                self._engine.setProperty("voice", chosen_id)
+def init_pyttsx3_engine(prefer_voice_substr: str = "", voice_index: Optional[int] = None, rate_delta: int = -20,
+                        fresh: bool = False) -> Any:
+    """pyttsx3.init() plus voice selection (index first, then substring) and rate adjustment.
+
+    pyttsx3.init() hands back one shared engine per driver; `fresh` builds an independent one instead.
+    """
+    engine = pyttsx3.Engine() if fresh else pyttsx3.init()
+
+    try:
+        voices: List[Any] = engine.getProperty("voices") or []
+        chosen_id = None
+
+        if voice_index is not None:
+            if 0 <= voice_index < len(voices):
+                chosen_id = getattr(voices[voice_index], "id", None)
+                print(f"[pyttsx3] Using voice index {voice_index}: {chosen_id}")
             else:
-                if prefer_voice_substr or (voice_index is not None):
-                    print("[pyttsx3] Preferred voice not found; using default.")
-        except Exception as e:
-            print(f"[pyttsx3] Voice selection failed: {e}")
+                print(f"[pyttsx3] Voice index {voice_index} out of range (0..{len(voices)-1}). Ignoring.")
+
+        if chosen_id is None and prefer_voice_substr:
+            needle = prefer_voice_substr.lower()
+            # Lowercased id/name -> id, in voice order; an exact hit wins, else the first substring hit.
+            by_key: "dict[str, Any]" = {}
+            for v in voices:
+                vid = getattr(v, "id", None)
+                if not vid:
+                    continue
+                by_key.setdefault(vid.lower(), vid)
+                by_key.setdefault((getattr(v, "name", None) or "").lower(), vid)
+            chosen_id = by_key.get(needle) or next((vid for k, vid in by_key.items() if needle in k), None)
+            if chosen_id:
+                print(f"[pyttsx3] Using voice by name '{prefer_voice_substr}': {chosen_id}")
+
+        if chosen_id:
+            engine.setProperty("voice", chosen_id)
+        else:
+            if prefer_voice_substr or (voice_index is not None):
+                print("[pyttsx3] Preferred voice not found; using default.")
+    except Exception as e:
+        print(f"[pyttsx3] Voice selection failed: {e}")
+
+    try:
+        rate = engine.getProperty("rate")
+        engine.setProperty("rate", rate + rate_delta)
+        print(f"[pyttsx3] Set speech rate to {engine.getProperty('rate')}")
+    except Exception as e:
+        print(f"[pyttsx3] Failed to set rate: {e}")
+
+    return engine
+
+def render_pyttsx3(engine_ctx: ContextManager[Any], phrase: str, wav_path: str, ogg_path: str) -> str:
+    """Synthesize `phrase` to a temp WAV, then encode it to `ogg_path`.
+
+    The engine comes from `engine_ctx` and is only held for synthesis, not for the encode.
+    """
+    with engine_ctx as engine:
+        engine.save_to_file(phrase, wav_path)
+        engine.runAndWait()
+    # The temp WAV is left for the scratch janitor; no unlink on the request path.
+    encode_ogg(wav_path, ogg_path, "wav")
+    return ogg_path
+
+
+# Worker-process side of PyTTSX3Generator(processes=N): one engine per child, built by the initializer.
+_worker_engine: Any = None
 
+def _init_worker_engine(prefer_voice_substr: str, voice_index: Optional[int], rate_delta: int) -> None:
+    global _worker_engine
+    _worker_engine = init_pyttsx3_engine(prefer_voice_substr, voice_index, rate_delta)
+
+def _render_in_worker(phrase: str, wav_path: str, ogg_path: str) -> str:
+    return render_pyttsx3(nullcontext(_worker_engine), phrase, wav_path, ogg_path)
+
+
+class PyTTSX3Generator(BaseTTS):
+    """pyttsx3 (offline).
+
+    In-process renders borrow an engine from a pool of `pool_size` (default: 1) pre-built engines.
+    Extra engines are only built on drivers whose engines are independent (SAPI5); espeak's driver
+    is process-global, so there concurrency comes from `processes` > 0, where synth+encode run in
+    spawned worker processes instead.
+    """
+    def __init__(self, prefer_voice_substr: str = "", voice_index: Optional[int] = None, rate_delta: int = -20,
+                 processes: int = 0, pool_size: Optional[int] = None):
+        self._engine = init_pyttsx3_engine(prefer_voice_substr, voice_index, rate_delta)
+
+        # Voice/rate are fixed from here on; snapshot them for cache keys.
         try:
-            rate = self._engine.getProperty("rate")
-            self._engine.setProperty("rate", rate + rate_delta)
-            print(f"[pyttsx3] Set speech rate to {self._engine.getProperty('rate')}")
-        except Exception as e:
-            print(f"[pyttsx3] Failed to set rate: {e}")
+            self._voice_id = self._engine.getProperty("voice")
+            self._rate = self._engine.getProperty("rate")
+        except Exception:
+            self._voice_id, self._rate = None, None
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if processes > 0:
+            # spawn, not fork: pyttsx3 drivers (NSSS/SAPI/espeak) don't survive a fork.
+            self._pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker_engine,
+                initargs=(prefer_voice_substr, voice_index, rate_delta),
+            )
+            print(f"[pyttsx3] Rendering in {processes} worker processes.")
+
+        # Engines for in-process renders; the shared one from pyttsx3.init() plus fresh extras.
+        self._engines: "queue.Queue[Any]" = queue.Queue()
+        self._engines.put(self._engine)
+        if self._pool is None:
+            size = max(1, pool_size or 1)
+            driver = pyttsx3_driver_name(self._engine)
+            if size > 1 and driver not in _POOLABLE_PYTTSX3_DRIVERS:
+                # espeak: every new driver instance steals the global synth callback from the older
+                # ones, whose runAndWait() then never finishes. Use worker processes instead.
+                print(f"[pyttsx3] The {driver or 'current'} driver can't run several engines in one process; "
+                      f"ignoring --tts-workers {size}. Use --synth-processes for concurrent renders.")
+                size = 1
+            for _ in range(size - 1):
+                try:
+                    self._engines.put(init_pyttsx3_engine(prefer_voice_substr, voice_index, rate_delta, fresh=True))
+                except Exception as e:
+                    print(f"[pyttsx3] Engine pool stopped at {self._engines.qsize()}: {e}")
+                    break
+            print(f"[pyttsx3] Engine pool size: {self._engines.qsize()}")
+
+    @contextmanager
+    def _borrow_engine(self) -> Iterator[Any]:
+        engine = self._engines.get()
+        try:
+            yield engine
+        finally:
+            self._engines.put(engine)
 
     def list_voices(self) -> List[dict]:
         out: List[dict] = []
@@ -298,21 +1001,19 @@ class PyTTSX3Generator(BaseTTS):
             out.append({"error": f"Failed to enumerate voices: {e}"})
         return out
 
+    def cache_key(self, phrase: str) -> tuple:
+        return ("pyttsx3", phrase, self._voice_id, self._rate)
+
     def generate_ogg(self, spec: AudioSpec) -> str:
-        ensure_dir(spec.audio_dir)
-        with self._lock:
-            self._engine.save_to_file(spec.phrase, spec.tmp_wav_path)
-            self._engine.runAndWait()
-        try:
-            audio = AudioSegment.from_wav(spec.tmp_wav_path)
-            audio.export(spec.ogg_path, format="ogg")
-        finally:
-            for p in (spec.tmp_wav_path,):
-                if os.path.exists(p):
-                    try:
-                        os.remove(p)
-                    except Exception:
-                        pass
+        key = self.cache_key(spec.phrase)
+        cache = phrase_cache(spec.audio_dir)
+        if cache.restore(key, spec.ogg_path):
+            return spec.ogg_path
+        if self._pool is not None:
+            self._pool.submit(_render_in_worker, spec.phrase, spec.tmp_wav_path, spec.ogg_path).result()
+        else:
+            render_pyttsx3(self._borrow_engine(), spec.phrase, spec.tmp_wav_path, spec.ogg_path)
+        cache.store(key, spec.ogg_path)
         return spec.ogg_path
 
 
@@ -321,61 +1022,534 @@ class GTTSGenerator(BaseTTS):
     def __init__(self, lang: str = "en", tld: str = "com"):
         if gTTS is None:
             raise RuntimeError("gTTS is not installed. `pip install gTTS`")
+        # Validate once here; per-request gTTS objects then skip gTTS's own lang check.
+        langs = gtts_language_table()
+        if langs and lang not in langs:
+            raise ValueError(f"Unsupported gTTS language: {lang}")
         self.lang = lang
         self.tld = tld
 
     def list_voices(self) -> List[dict]:
         # gTTS doesn't expose voices, only languages. Return that info + tld.
         try:
-            langs = gtts_langs() if gtts_langs else {}
+            langs = gtts_language_table()
             entries = [{"lang": k, "name": v} for k, v in sorted(langs.items(), key=lambda kv: kv[0])]
             return [{"engine": "gtts", "tld": self.tld, "languages": entries}]
         except Exception as e:
             return [{"engine": "gtts", "tld": self.tld, "error": f"Failed to list languages: {e}"}]
 
+    def cache_key(self, phrase: str) -> tuple:
+        return ("gtts", phrase, self.lang, self.tld)
+
     def generate_ogg(self, spec: AudioSpec) -> str:
-        ensure_dir(spec.audio_dir)
-        # Save mp3 via gTTS, then convert to ogg
-        tts = gTTS(text=spec.phrase, lang=self.lang, tld=self.tld, slow=False)
-        tts.save(spec.tmp_mp3_path)
+        key = self.cache_key(spec.phrase)
+        cache = phrase_cache(spec.audio_dir)
+        if cache.restore(key, spec.ogg_path):
+            return spec.ogg_path
+        # Fetch mp3 into memory, then convert to ogg (no temp file)
+        encode_ogg_bytes(gtts_fetch(spec.phrase, self.lang, self.tld), spec.ogg_path, "mp3")
+        cache.store(key, spec.ogg_path)
+        return spec.ogg_path
+
+
+def espeak_ng_to_ogg(text: str, voice: str, ogg_path: str) -> None:
+    """espeak-ng --stdout encoded in-process by soundfile, or piped straight into one ffmpeg.
+
+    Either way there is no temp WAV and no pyttsx3.
+    """
+    if sf is not None and "WAV" in _SF_FORMATS and "OGG" in _SF_FORMATS:
+        proc = subprocess.run(["espeak-ng", "-v", voice, "--stdin", "--stdout"],
+                              input=text.encode("utf-8"), capture_output=True)
+        if proc.returncode != 0 or not proc.stdout:
+            raise RuntimeError(f"espeak-ng failed ({proc.returncode}): "
+                               f"{proc.stderr.decode('utf-8', 'replace').strip()}")
+        encode_ogg_bytes(proc.stdout, ogg_path, "wav")
+        return
+    with atomic_output(ogg_path) as out:
+        synth = subprocess.Popen(["espeak-ng", "-v", voice, "--stdin", "--stdout"],
+                                 stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        enc = subprocess.Popen(["ffmpeg", "-loglevel", "error", "-i", "pipe:0", *FFMPEG_VORBIS_ARGS,
+                                "-f", "ogg", "-y", out],
+                               stdin=synth.stdout, stderr=subprocess.PIPE)
+        synth.stdout.close()  # ffmpeg owns the read end now
+        synth.stdin.write(text.encode("utf-8"))
+        synth.stdin.close()
+        _, enc_err = enc.communicate()
+        synth.wait()
+        if synth.returncode != 0 or enc.returncode != 0:
+            raise RuntimeError(f"espeak-ng/ffmpeg failed ({synth.returncode}/{enc.returncode}): "
+                               f"{enc_err.decode('utf-8', 'replace').strip()}")
+
+
+class EspeakNGGenerator(BaseTTS):
+    """espeak-ng CLI (offline, Linux). One espeak-ng process per render; no encoder process with soundfile."""
+    def __init__(self, voice: str = "en-us"):
+        if shutil.which("espeak-ng") is None:
+            raise RuntimeError("espeak-ng is not installed (e.g. `apt install espeak-ng`).")
+        self.voice = voice
+
+    def list_voices(self) -> List[dict]:
         try:
-            audio = AudioSegment.from_file(spec.tmp_mp3_path, format="mp3")
-            audio.export(spec.ogg_path, format="ogg")
+            proc = subprocess.run(["espeak-ng", "--voices"], capture_output=True, text=True, check=True)
+        except Exception as e:
+            return [{"engine": "espeak-ng", "error": f"Failed to list voices: {e}"}]
+        out: List[dict] = []
+        for line in proc.stdout.splitlines()[1:]:  # skip header
+            cols = line.split()
+            if len(cols) >= 5:
+                out.append({"language": cols[1], "gender": cols[2], "name": cols[3], "file": cols[4]})
+        return out
+
+    def cache_key(self, phrase: str) -> tuple:
+        return ("espeak-ng", phrase, self.voice)
+
+    def generate_ogg(self, spec: AudioSpec) -> str:
+        key = self.cache_key(spec.phrase)
+        cache = phrase_cache(spec.audio_dir)
+        if cache.restore(key, spec.ogg_path):
+            return spec.ogg_path
+        espeak_ng_to_ogg(spec.phrase, self.voice, spec.ogg_path)
+        cache.store(key, spec.ogg_path)
+        return spec.ogg_path
+
+
+def pcm16_to_wav_bytes(samples: Any, sr: int) -> bytes:
+    """Wrap mono int16 samples in an in-memory WAV (for the ffmpeg pipe when soundfile is missing)."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+class _BatchItem:
+    __slots__ = ("phrase", "done", "samples", "error")
+
+    def __init__(self, phrase: str):
+        self.phrase = phrase
+        self.done = threading.Event()
+        self.samples: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class PiperBatcher:
+    """Coalesces concurrent Piper renders into one padded, batched session.run.
+
+    A daemon thread takes the first queued phrase, waits up to `window_s` for more (at most
+    `max_batch`), runs them through the model together and wakes each caller. Identical phrases
+    in a batch are synthesized once. Multi-sentence phrases skip batching.
+    """
+    def __init__(self, voice: Any, max_batch: int = 8, window_s: float = 0.005):
+        self._voice = voice
+        self.max_batch = max(1, max_batch)
+        self.window_s = window_s
+        self._q: "queue.Queue[_BatchItem]" = queue.Queue()
+        threading.Thread(target=self._loop, name="piper-batcher", daemon=True).start()
+
+    def synthesize(self, phrase: str) -> Any:
+        item = _BatchItem(phrase)
+        self._q.put(item)
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.samples
+
+    def _loop(self) -> None:
+        while True:
+            items = [self._q.get()]
+            deadline = time.monotonic() + self.window_s
+            while len(items) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(items)
+
+    def _run(self, items: List[_BatchItem]) -> None:
+        by_phrase: "OrderedDict[str, List[_BatchItem]]" = OrderedDict()
+        for item in items:
+            by_phrase.setdefault(item.phrase, []).append(item)
+        try:
+            batch: List[Tuple[str, List[int]]] = []
+            for phrase, waiters in by_phrase.items():
+                sentences = [p for p in self._voice.phonemize(phrase) if p]
+                if len(sentences) == 1:
+                    batch.append((phrase, self._voice.phonemes_to_ids(sentences[0])))
+                else:
+                    samples = piper_synthesize(self._voice, phrase)
+                    for w in waiters:
+                        w.samples = samples
+            if batch:
+                for (phrase, _), samples in zip(batch, self._run_batch([ids for _, ids in batch])):
+                    for w in by_phrase[phrase]:
+                        w.samples = samples
+        except Exception as e:
+            print(f"[piper] Batch of {len(items)} failed: {e}")
+            for item in items:
+                if item.samples is None:
+                    item.error = e
         finally:
-            for p in (spec.tmp_mp3_path,):
-                if os.path.exists(p):
-                    try:
-                        os.remove(p)
-                    except Exception:
-                        pass
+            for item in items:
+                item.done.set()
+
+    def _run_batch(self, id_lists: List[List[int]]) -> List[Any]:
+        cfg = self._voice.config
+        ids = np.zeros((len(id_lists), max(map(len, id_lists))), dtype=np.int64)  # 0 is Piper's PAD id
+        for i, row in enumerate(id_lists):
+            ids[i, :len(row)] = row
+        args = {
+            "input": ids,
+            "input_lengths": np.array([len(row) for row in id_lists], dtype=np.int64),
+            "scales": np.array([cfg.noise_scale, cfg.length_scale, cfg.noise_w_scale], dtype=np.float32),
+        }
+        if cfg.num_speakers > 1:
+            args["sid"] = np.full(len(id_lists), cfg.default_speaker_id or 0, dtype=np.int64)
+        result = self._voice.session.run(None, args)
+        audio = result[0].reshape(len(id_lists), -1)
+        # Voices exported with alignments also return per-phoneme durations (in frames): the exact
+        # length of each row's audio, as Piper itself computes it.
+        durations = result[1].reshape(len(id_lists), -1) if len(result) > 1 else None
+        hop = getattr(cfg, "hop_length", 256)
+        out = []
+        for i, (row, samples) in enumerate(zip(id_lists, audio)):
+            if len(row) < ids.shape[1]:  # padded: drop what the padding produced, nothing else
+                if durations is not None:
+                    samples = samples[: int((durations[i, :len(row)] * hop).astype(np.int64).sum())]
+                else:
+                    samples = trim_tail(samples)
+            out.append(float_to_pcm16(samples))
+        return out
+
+
+def trim_tail(audio: Any, rel_threshold: float = 0.01) -> Any:
+    """Drop the near-silent tail a padded batch leaves after a shorter phrase.
+
+    Fallback for voices without duration outputs; rows that weren't padded are never trimmed.
+    """
+    loud = np.flatnonzero(np.abs(audio) > rel_threshold * float(np.max(np.abs(audio)) or 1.0))
+    return audio[: loud[-1] + 1] if loud.size else audio[:0]
+
+
+def float_to_pcm16(audio: Any) -> Any:
+    """Peak-normalize and convert to int16, matching Piper's own defaults."""
+    peak = float(np.max(np.abs(audio))) if audio.size else 0.0
+    if peak > 1e-8:
+        audio = audio / peak
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def piper_synthesize(voice: Any, phrase: str) -> Any:
+    """Mono int16 samples at the voice's rate, one chunk per sentence concatenated."""
+    chunks = [c.audio_int16_array for c in voice.synthesize(phrase)]
+    if not chunks:
+        raise RuntimeError(f"piper produced no audio for {phrase!r}")
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+class PiperGenerator(BaseTTS):
+    """Piper ONNX voice (offline). onnxruntime sessions are thread-safe, so no engine pool or lock.
+
+    With max_batch > 1, concurrent renders are coalesced by a PiperBatcher.
+    """
+    def __init__(self, model_path: str, intra_op_threads: Optional[int] = None, max_batch: int = 8):
+        if PiperVoice is None:
+            raise RuntimeError("piper-tts is not installed. `pip install piper-tts`")
+        if not model_path:
+            raise ValueError("--piper-model is required with --engine piper")
+        self.model_path = os.path.abspath(model_path)
+        with open(f"{self.model_path}.json", "r", encoding="utf-8") as f:
+            config = PiperConfig.from_dict(json.load(f))
+
+        # Built here rather than via PiperVoice.load(), which loads the model with default session
+        # options; pin intra-op threads so concurrent requests don't each spin up a full CPU's worth.
+        so = onnxruntime.SessionOptions()
+        so.intra_op_num_threads = intra_op_threads or min(4, os.cpu_count() or 1)
+        session = onnxruntime.InferenceSession(self.model_path, sess_options=so, providers=["CPUExecutionProvider"])
+        self._voice = PiperVoice(session=session, config=config)
+        self.sample_rate = self._voice.config.sample_rate
+        self._batcher = PiperBatcher(self._voice, max_batch=max_batch) if max_batch > 1 else None
+        print(f"[piper] Loaded {os.path.basename(self.model_path)} ({self.sample_rate} Hz)")
+
+    def list_voices(self) -> List[dict]:
+        return [{
+            "engine": "piper",
+            "model": os.path.basename(self.model_path),
+            "language": getattr(self._voice.config, "espeak_voice", None),
+            "sample_rate": self.sample_rate,
+        }]
+
+    def cache_key(self, phrase: str) -> tuple:
+        return ("piper", phrase, self.model_path)
+
+    def synthesize(self, phrase: str) -> Any:
+        if self._batcher is not None:
+            return self._batcher.synthesize(phrase)
+        return piper_synthesize(self._voice, phrase)
+
+    def generate_ogg(self, spec: AudioSpec) -> str:
+        key = self.cache_key(spec.phrase)
+        cache = phrase_cache(spec.audio_dir)
+        if cache.restore(key, spec.ogg_path):
+            return spec.ogg_path
+        samples = self.synthesize(spec.phrase)
+        if sf is not None and "OGG" in _SF_FORMATS:
+            write_vorbis(samples, self.sample_rate, spec.ogg_path)
+        else:
+            ffmpeg_pipe_to_ogg(pcm16_to_wav_bytes(samples, self.sample_rate), spec.ogg_path)
+        cache.store(key, spec.ogg_path)
         return spec.ogg_path
 
 
+@lru_cache(maxsize=32)
+def gtts_generator_for(lang: str, tld: str) -> GTTSGenerator:
+    """Shared GTTSGenerator per (lang, tld), instead of a new one per request."""
+    return GTTSGenerator(lang=lang, tld=tld)
+
+
 class AudioService:
-    def __init__(self, audio_dir: str, tts_engine: BaseTTS, max_files: int) -> None:
+    # Live services per audio dir, so a cleanup run by one can invalidate the others' path caches.
+    _peers: "dict[str, weakref.WeakSet[AudioService]]" = {}
+    _peers_lock = threading.Lock()
+
+    PATH_CACHE_SIZE: Final[int] = 4096
+
+    # Background renders for request_audio (wait=0), shared by every service: services are built per
+    # user-chosen gTTS lang/tld, and a pool each would leave threads behind whenever one is dropped.
+    _executor: Final[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                                              thread_name_prefix="tts")
+
+    def __init__(self, audio_dir: str, tts_engine: BaseTTS, max_files: int, tmp_dir: Optional[str] = None,
+                 max_age_s: float = 0) -> None:
         self.audio_dir: Final[str] = audio_dir
+        self.tmp_dir: Final[str] = tmp_dir or audio_dir
         self.tts: Final[BaseTTS] = tts_engine
         self.max_files: Final[int] = max_files
+        self.max_age_s: Final[float] = max_age_s
+        # (action, raw username) -> (ogg_path, filename) of files known to exist; LRU, PATH_CACHE_SIZE entries.
+        self._path_cache: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        # Filenames known to be in audio_dir, kept current on our own writes/cleanups so the hot path
+        # checks existence with a set lookup instead of a stat. Other processes (sibling gunicorn
+        # workers' cleanups, manual deletes) change the dir behind our back; _sync_present catches
+        # that through the dir's mtime, checked at most every PRESENT_RECHECK_S.
+        self._present_lock = threading.Lock()
+        self._present: "set[str]" = set()
+        self._present_mtime: Optional[int] = None
+        self._present_checked = float("-inf")
+        self._sync_present()
+        # filename -> Future of the render in progress. Later callers for the same file wait on it
+        # instead of rendering again; entries are dropped as soon as the render ends.
+        self._inflight: "dict[str, Future]" = {}
+        self._inflight_lock = threading.Lock()
+        with AudioService._peers_lock:
+            AudioService._peers.setdefault(audio_dir, weakref.WeakSet()).add(self)
+
+    def _sync_present(self) -> None:
+        """Rescan audio_dir if its entries changed since the last scan (throttled)."""
+        now = time.monotonic()
+        if now - self._present_checked < PRESENT_RECHECK_S:
+            return
+        self._present_checked = now
+        try:
+            mtime: Optional[int] = os.stat(self.audio_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = -1
+        if mtime == self._present_mtime:
+            return
+        try:
+            with os.scandir(self.audio_dir) as it:
+                names = {e.name for e in it if e.name.endswith(".ogg")}
+        except FileNotFoundError:
+            names = set()
+        if mtime is not None and time.time_ns() - mtime < 1_000_000_000:
+            # Changed within the filesystem's timestamp granularity: a further change could land
+            # with the same mtime, so scan again next time rather than trusting this one.
+            mtime = None
+        with self._present_lock:
+            self._present = names
+            self._present_mtime = mtime
+            for key, (_path, name) in list(self._path_cache.items()):
+                if name not in names:
+                    self._path_cache.pop(key, None)
+
+    def _forget(self, removed: set) -> None:
+        with self._present_lock:
+            self._present.difference_update(os.path.basename(p) for p in removed)
+            for key, (path, _name) in list(self._path_cache.items()):
+                if path in removed:
+                    self._path_cache.pop(key, None)
+
+    def _cleanup(self) -> None:
+        removed = cleanup_audio_dir(self.audio_dir, self.max_files, self.max_age_s)
+        if removed:
+            gone = set(removed)
+            with AudioService._peers_lock:
+                peers = list(AudioService._peers.get(self.audio_dir, ()))
+            for svc in peers:
+                svc._forget(gone)
+
+    def _render(self, spec: AudioSpec) -> None:
+        # Dirs are created once at startup. If one vanished since (manual wipe, tmpfs reset) the render
+        # fails; recreate what's missing and retry once. Encoders report a missing dir differently
+        # (libsndfile raises a generic error), so check the dirs rather than the exception type.
+        try:
+            self.tts.generate_ogg(spec)
+        except Exception:
+            dirs = (self.audio_dir, phrase_cache(self.audio_dir).canon_dir, self.tmp_dir)
+            missing = [d for d in dirs if not os.path.isdir(d)]
+            if not missing:
+                raise
+            for d in missing:
+                os.makedirs(d, exist_ok=True)
+            self.tts.generate_ogg(spec)
+
+    def _resolve(self, username: str, act: str) -> Tuple[Tuple[str, str], Optional[AudioSpec]]:
+        """(absolute_path, filename) for this request, plus the spec to render if it isn't on disk yet."""
+        # Hot path: a file we already resolved for this exact request is a dict hit, no fs access.
+        # Keyed on the raw name since the phrase (and so the content id) uses it.
+        self._sync_present()
+        key = (act, username)
+        hit = self._path_cache.get(key)
+        if hit is not None:
+            try:
+                self._path_cache.move_to_end(key)
+            except KeyError:
+                pass  # evicted/forgotten since the get; the answer is still good for this request
+            return hit, None
 
-    def create_audio(self, username: str, action: str) -> Tuple[str, str]:
-        """Always create a brand new audio file. Returns (absolute_path, filename)."""
-        ensure_dir(self.audio_dir)
-
-        act = action.strip().lower()
-        if act not in ("join", "leave"):
+        if act not in _ACTIONS:
             raise ValueError("Parameter 'action' must be 'join' or 'leave'.")
 
-        spec = AudioSpec(username_raw=username, action=act, audio_dir=self.audio_dir)
-        ogg_path = self.tts.generate_ogg(spec)
+        uid = content_id(self.tts.cache_key(build_phrase(username, act)))  # type: ignore
+        filename = audio_filename(uid, username, act)
+        if filename in self._present:
+            # On disk already: no AudioSpec (scratch name, joins) needed just to return its path.
+            result = (os.path.join(self.audio_dir, filename), filename)
+            with self._present_lock:
+                self._remember(key, result)
+            return result, None
+        spec = AudioSpec(username_raw=username, action=act, audio_dir=self.audio_dir, tmp_dir=self.tmp_dir, uid=uid)
+        return (spec.ogg_path, spec.filename), spec
+
+    def _remember(self, key: Tuple[str, str], result: Tuple[str, str]) -> None:
+        # Caller holds self._present_lock.
+        self._path_cache[key] = result
+        self._path_cache.move_to_end(key)
+        while len(self._path_cache) > self.PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+
+    def _complete(self, spec: AudioSpec, result: Tuple[str, str]) -> None:
+        name = spec.filename
+        with self._inflight_lock:
+            if name in self._present:  # finished by another request since _resolve
+                return
+            fut = self._inflight.get(name)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[name] = Future()
+        if not owner:
+            fut.result()  # re-raises the owner's failure
+            return
+
+        try:
+            # Engines always render; existence is ours to check. This stat only happens on a miss,
+            # and catches files another process (e.g. a sibling gunicorn worker) wrote meanwhile.
+            if not reuse_existing(spec.ogg_path):
+                self._render(spec)
+            with self._present_lock:
+                self._present.add(name)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(None)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(name, None)
 
         # Cleanup after successful generation
-        cleanup_audio_dir(self.audio_dir, self.max_files)
+        self._cleanup()
 
-        return ogg_path, spec.filename
+        with self._present_lock:
+            if spec.filename in self._present:  # a concurrent cleanup may already have trimmed it
+                self._remember((spec.action, spec.username_raw), result)
+
+    def _complete_in_background(self, spec: AudioSpec, result: Tuple[str, str]) -> None:
+        try:
+            self._complete(spec, result)
+        except Exception as e:
+            print(f"[tts] Background render of {spec.filename} failed: {e}")
+            raise
+
+    def has_file(self, filename: str) -> bool:
+        """True if filename is (as far as this service knows) still in audio_dir."""
+        self._sync_present()
+        return filename in self._present
+
+    def get_or_create_audio(self, username: str, action: str) -> Tuple[str, str]:
+        """Return the audio file for this phrase+engine settings, rendering it if it doesn't exist yet.
+
+        Filenames are content ids, so identical requests share one file (and one URL).
+        Returns (absolute_path, filename).
+        """
+        result, pending = self._resolve(username, action.strip().lower())
+        if pending is not None:
+            self._complete(pending, result)
+        return result
+
+    def request_audio(self, username: str, action: str) -> Tuple[Tuple[str, str], Optional[Future]]:
+        """Non-blocking get_or_create_audio: returns (path, filename) at once, plus the render's Future
+        when the file still has to be made. Concurrent requests for the same file share one render.
+        """
+        result, pending = self._resolve(username, action.strip().lower())
+        if pending is None:
+            return result, None
+        with self._inflight_lock:
+            fut = self._inflight.get(pending.filename)
+        if fut is None:
+            # A duplicate submit in the gap before the render registers itself is harmless:
+            # _complete finds the first one in flight (or finished) and just waits.
+            fut = self._executor.submit(self._complete_in_background, pending, result)
+        return result, fut
+
+    def _prewarm_one(self, username: str, act: Action) -> Optional[str]:
+        try:
+            return self.get_or_create_audio(username, act)[1]
+        except Exception as e:
+            print(f"[prewarm] Failed for {username!r}/{act}: {e}")
+            return None
+
+    def prewarm(self, usernames: List[str]) -> int:
+        """Render join+leave for every user. Returns the number of clips ready.
+
+        The final files land in audio_dir (as many as max_files keeps); every phrase also gets a
+        canonical in the phrase cache, so the rest are a hardlink away on first request.
+        """
+        phrase_cache(self.audio_dir).reserve(2 * len(usernames))
+        jobs = [(u, act) for u in usernames for act in ("join", "leave")]
+        # Synthesis itself is bounded by the engine's own pool; threads overlap the encode step.
+        with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as ex:
+            names = [n for n in ex.map(lambda job: self._prewarm_one(*job), jobs) if n]
+        on_disk = sum(1 for n in names if n in self._present)
+        print(f"[prewarm] {len(names)}/{len(jobs)} clips for {len(usernames)} users ready; "
+              f"{on_disk} on disk, {len(names) - on_disk} in the phrase cache.")
+        return len(names)
 
 
 # ---------- FLASK FACTORY ----------
 
+class AudioFlask(Flask):
+    """Flask whose send_file max-age covers generated audio for a year."""
+    def get_send_file_max_age(self, filename: Optional[str]) -> Optional[int]:
+        if filename and filename.lower().endswith(".ogg"):
+            return AUDIO_MAX_AGE
+        return super().get_send_file_max_age(filename)
+
+
 def create_app(
     external_base_url: str = "",
     engine_name: EngineName = "pyttsx3",
@@ -384,24 +1558,113 @@ def create_app(
     gtts_lang_code: str = "en",
     gtts_tld: str = "com",
     max_files: int = 50,
+    prewarm_users: str = "",
+    accel_redirect_prefix: str = "",
+    x_sendfile: bool = False,
+    synth_processes: int = 0,
+    max_age_minutes: float = 0,
+    espeak_voice: str = "en-us",
+    tts_workers: Optional[int] = None,
+    piper_model: str = "",
 ) -> Flask:
     root, audio_dir = project_paths()
-    app = Flask(__name__, static_url_path="/static", static_folder=os.path.join(root, "static"))
+    phrase_cache(audio_dir)  # adopt (and move out of static/, if still there) the canonicals up front
+    app = AudioFlask(__name__, static_url_path="/static", static_folder=os.path.join(root, "static"))
+    # Every generated file sits directly in audio_dir, so its static-relative URL path is this + filename.
+    app.config["STATIC_ABS"] = os.path.abspath(app.static_folder)
+    app.config["_AUDIO_REL_DIR"] = os.path.relpath(audio_dir, app.config["STATIC_ABS"]).replace("\\", "/") + "/"
     app.config["EXTERNAL_BASE_URL"] = external_base_url
+    app.config["_BASE_URL_VALID"] = is_valid_base_url(external_base_url)
     app.config["ENGINE_NAME"] = engine_name
     app.config["GTTS_LANG"] = gtts_lang_code
     app.config["GTTS_TLD"] = gtts_tld
     app.config["PYTTSX3_VOICE"] = tts_voice
     app.config["PYTTSX3_VOICE_INDEX"] = tts_voice_index
     app.config["MAX_FILES"] = max_files
+    app.config["MAX_AGE_S"] = max_age_minutes * 60
+    app.config["ACCEL_REDIRECT_PREFIX"] = accel_redirect_prefix
+    app.config["USE_X_SENDFILE"] = x_sendfile
+    app.config["OFFLOAD_MEDIA"] = bool(accel_redirect_prefix or x_sendfile)
+    # With a valid configured base every URL is this prefix + filename, so build it once, already
+    # encoded: the response body is then one bytes concat (filenames are ASCII by construction).
+    app.config["_STATIC_PREFIX"] = None
+    if app.config["_BASE_URL_VALID"]:
+        rel_dir = "media/" if app.config["OFFLOAD_MEDIA"] else "static/" + app.config["_AUDIO_REL_DIR"]
+        app.config["_STATIC_PREFIX"] = urljoin(external_base_url.rstrip("/") + "/", rel_dir).encode("utf-8")
 
     # Build default engine
     if engine_name == "gtts":
         tts_engine: BaseTTS = GTTSGenerator(lang=gtts_lang_code, tld=gtts_tld)
+    elif engine_name == "espeak-ng":
+        tts_engine = EspeakNGGenerator(voice=espeak_voice)
+    elif engine_name == "piper":
+        tts_engine = PiperGenerator(model_path=piper_model)
     else:
-        tts_engine = PyTTSX3Generator(prefer_voice_substr=(tts_voice or ""), voice_index=tts_voice_index)
+        tts_engine = PyTTSX3Generator(prefer_voice_substr=(tts_voice or ""), voice_index=tts_voice_index,
+                                      processes=synth_processes, pool_size=tts_workers)
+
+    tmp_dir = scratch_dir(audio_dir)
+    start_scratch_janitor(tmp_dir)
+    service = AudioService(audio_dir=audio_dir, tts_engine=tts_engine, max_files=max_files, tmp_dir=tmp_dir,
+                           max_age_s=app.config["MAX_AGE_S"])
 
-    service = AudioService(audio_dir=audio_dir, tts_engine=tts_engine, max_files=max_files)
+    users: List[str] = []
+    if prewarm_users:
+        try:
+            users = load_usernames(prewarm_users)
+        except Exception as e:
+            print(f"[prewarm] Skipped {prewarm_users}: {e}")
+    # PRELOAD_USERNAMES: newline-separated (names may contain commas).
+    users += [u.strip() for u in os.getenv("PRELOAD_USERNAMES", "").splitlines() if u.strip()]
+    if users:
+        service.prewarm(list(dict.fromkeys(users)))
+
+    @lru_cache(maxsize=32)
+    def gtts_service_for(lang: str, tld: str) -> AudioService:
+        if engine_name == "gtts" and (lang, tld) == (gtts_lang_code, gtts_tld):
+            return service
+        return AudioService(audio_dir=service.audio_dir, tts_engine=gtts_generator_for(lang, tld),
+                            max_files=app.config["MAX_FILES"], tmp_dir=service.tmp_dir,
+                            max_age_s=app.config["MAX_AGE_S"])
+
+    # (engine key, base, username, action) -> (filename, body, etag) of answered 200s, so a repeat request
+    # skips resolving and URL building. The base is the request's url_root unless the URL is host-independent.
+    # Keyed on plain values, not the service, so entries never keep an evicted gTTS service alive.
+    response_cache: "OrderedDict[tuple, Tuple[str, bytes, str]]" = OrderedDict()
+
+    def cached_response(key: tuple, service_: AudioService) -> Optional[Response]:
+        hit = response_cache.get(key)
+        if hit is None:
+            return None
+        filename, body, etag = hit
+        if not service_.has_file(filename):  # cleaned up since; take the slow path to re-render it
+            response_cache.pop(key, None)
+            return None
+        try:
+            response_cache.move_to_end(key)
+        except KeyError:
+            pass
+        return url_response(body, etag)
+
+    def url_response(body: bytes, etag: str) -> Response:
+        resp = Response(body, status=200, mimetype="text/plain")
+        resp.headers["Cache-Control"] = TTS_URL_CACHE_CONTROL
+        resp.set_etag(etag)
+        return resp.make_conditional(request)
+
+    @app.after_request
+    def audio_cache_headers(resp: Response) -> Response:
+        path = request.path
+        if resp.status_code != 200 or not path.endswith(".ogg"):
+            return resp
+        if not (path.startswith("/static/audio/") or path.startswith("/media/")):
+            return resp
+        resp.headers["Cache-Control"] = f"public, max-age={AUDIO_MAX_AGE}, immutable"
+        etag = audio_etag(path.rsplit("/", 1)[-1])
+        if etag:
+            resp.set_etag(etag)
+            resp = resp.make_conditional(request)
+        return resp
 
     @app.get("/api/tts")
     def tts_endpoint():
@@ -414,80 +1677,175 @@ def create_app(
         # Optional per-request gTTS overrides (lang/tld)
         req_lang = request.args.get("lang", type=str)
         req_tld = request.args.get("tld", type=str)
+        # wait=0: don't block on a cold render; answer 202 with the URL the file will appear at.
+        wait = request.args.get("wait", default="1", type=str).strip().lower() not in ("0", "false", "no")
 
         if not username or not action:
             return abort(400, description="Missing 'username' or 'action'.")
 
-        # Resolve engine for this request
+        # Resolve engine for this request. gTTS is built per request; any other value falls back to the
+        # server's engine, except piper, which needs a model loaded at startup (--piper-model).
         current_engine_name = app.config["ENGINE_NAME"]
-        if req_engine in ("pyttsx3", "gtts"):
+        if req_engine == "gtts":
             current_engine_name = req_engine  # type: ignore
-
-        # Build a per-request engine if different from the default or needs different gTTS params
-        local_service = service
-        if current_engine_name == "gtts":
-            lang = (req_lang or app.config["GTTS_LANG"])
-            tld = (req_tld or app.config["GTTS_TLD"])
-            local_tts = GTTSGenerator(lang=lang, tld=tld)
-            local_service = AudioService(audio_dir=service.audio_dir, tts_engine=local_tts, max_files=app.config["MAX_FILES"])
-        elif current_engine_name == "pyttsx3" and req_engine == "pyttsx3":
-            # Reuse default pyttsx3 config (no per-request options exposed here)
-            pass
+        elif req_engine == "piper" and current_engine_name != "piper":
+            return abort(400, description="engine=piper needs the server started with --engine piper.")
 
         try:
-            ogg_path, _filename = local_service.create_audio(username=username, action=action)
+            # Pick the service for this request's engine / gTTS params (built once per combination)
+            local_service = service
+            engine_key: tuple = (current_engine_name,)
+            if current_engine_name == "gtts":
+                lang = (req_lang or app.config["GTTS_LANG"])
+                tld = (req_tld or app.config["GTTS_TLD"])
+                local_service = gtts_service_for(lang, tld)
+                engine_key = ("gtts", lang, tld)
+
+            if per_request_base and is_valid_base_url(per_request_base):
+                url_base = per_request_base
+            elif app.config["_STATIC_PREFIX"] and not per_request_base:
+                url_base = ""
+            else:  # URL built from the request's own host
+                url_base = request.url_root
+            cache_key = (engine_key, url_base, username, action)
+            cached = cached_response(cache_key, local_service)
+            if cached is not None:
+                return cached
+
+            pending = None
+            if wait:
+                _ogg_path, filename = local_service.get_or_create_audio(username=username, action=action)
+            else:
+                (_ogg_path, filename), pending = local_service.request_audio(username=username, action=action)
+                if pending is not None:
+                    # Phrase-cache restores and short renders finish well within this; only
+                    # genuinely slow renders get the 202.
+                    try:
+                        pending.result(timeout=ASYNC_GRACE_S)
+                    except FutureTimeoutError:
+                        pass
         except ValueError as e:
             return abort(400, description=str(e))
         except Exception as e:
             return abort(500, description=f"TTS generation failed: {e}")
 
-        static_folder = os.path.abspath(app.static_folder)
-        rel_path = os.path.relpath(ogg_path, static_folder).replace("\\", "/")
-        base_override = per_request_base or app.config.get("EXTERNAL_BASE_URL") or None
-        file_url = build_file_url(app, rel_path, base_override)
+        static_prefix = app.config["_STATIC_PREFIX"]
+        if static_prefix and not per_request_base:
+            file_url = static_prefix + filename.encode("ascii")
+        else:
+            if per_request_base:
+                base_override, base_valid = per_request_base, None  # validated (memoized) in build_file_url
+            else:
+                base_override, base_valid = app.config.get("EXTERNAL_BASE_URL") or None, app.config["_BASE_URL_VALID"]
+            if app.config["OFFLOAD_MEDIA"]:
+                file_url = build_file_url(app, filename, base_override, endpoint="media", base_valid=base_valid)
+            else:
+                file_url = build_file_url(app, app.config["_AUDIO_REL_DIR"] + filename, base_override,
+                                          base_valid=base_valid)
 
         # Return PLAIN TEXT ONLY (no JSON)
-        return Response(file_url, status=200, mimetype="text/plain")
+        if pending is not None and not pending.done():
+            resp = Response(file_url, status=202, mimetype="text/plain")
+            resp.headers["Cache-Control"] = "no-store"
+            return resp
+        body = file_url if isinstance(file_url, bytes) else file_url.encode("utf-8")
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        response_cache[cache_key] = (filename, body, etag)
+        while len(response_cache) > TTS_RESPONSE_CACHE_SIZE:
+            try:
+                response_cache.popitem(last=False)
+            except KeyError:
+                break
+        return url_response(body, etag)
+
+    @app.get("/media/<filename>")
+    def media(filename: str):
+        # Only bare generated names; no paths, no temp files.
+        if not filename.endswith(".ogg") or filename.startswith(".") or "/" in filename or "\\" in filename:
+            return abort(404)
+        prefix = app.config["ACCEL_REDIRECT_PREFIX"]
+        if prefix:
+            resp = Response(status=200, mimetype="audio/ogg")
+            resp.headers["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + filename
+            return resp
+        # send_from_directory emits X-Sendfile itself when USE_X_SENDFILE is on.
+        return send_from_directory(service.audio_dir, filename, mimetype="audio/ogg")
 
     @app.get("/api/voices")
     def list_voices():
         try:
-            # Reflect the default engine in /api/voices
-            if app.config["ENGINE_NAME"] == "gtts":
-                tts = GTTSGenerator(app.config["GTTS_LANG"], app.config["GTTS_TLD"])
-                voices = tts.list_voices()
-            else:
-                tts = PyTTSX3Generator(
-                    prefer_voice_substr=app.config["PYTTSX3_VOICE"] or "",
-                    voice_index=app.config["PYTTSX3_VOICE_INDEX"]
-                )
-                voices = tts.list_voices()
+            # Reflect the default engine in /api/voices. The list can't change while we run,
+            # so encode it once and serve the cached body afterwards.
+            body = app.config.get("_VOICES_JSON")
+            if body is None:
+                voices = tts_engine.list_voices()
+                body = json_bytes(voices, pretty=True)
+                if not any("error" in v for v in voices):
+                    app.config["_VOICES_JSON"] = body
             return app.response_class(
-                response=json.dumps(voices, indent=2, ensure_ascii=False),
+                response=body,
                 status=200,
                 mimetype="application/json",
             )
         except Exception as e:
             return abort(500, description=f"Failed to list voices/languages: {e}")
 
+    # Nothing in the health answer changes after startup.
+    health_body = json_bytes({"ok": True, "engine": app.config["ENGINE_NAME"], "max_files": app.config["MAX_FILES"]})
+
     @app.get("/")
     def health():
-        try:
-            ensure_dir(os.path.join(app.static_folder, "audio"))
-        except Exception:
-            pass
-        return jsonify({"ok": True, "engine": app.config["ENGINE_NAME"], "max_files": app.config["MAX_FILES"]}), 200
+        return app.response_class(response=health_body, status=200, mimetype="application/json")
 
     return app
 
 
+# ---------- PRODUCTION SERVER ----------
+
+def run_production(host: str, port: int, workers: int, threads: int, app_kwargs: dict) -> None:
+    """Replace this process with gunicorn serving create_app(**app_kwargs).
+
+    No --preload: every worker imports and builds its own app (and TTS engines) after the fork,
+    since pyttsx3 drivers don't survive one. Prewarming, if asked for, runs once here first so
+    workers start by adopting the rendered phrase cache instead of each redoing it.
+
+    gunicorn doesn't run on Windows; there (or when it isn't installed) waitress serves the app
+    in-process with `threads` threads and `workers` is ignored.
+    """
+    if os.name == "nt" or importlib.util.find_spec("gunicorn") is None:
+        try:
+            from waitress import serve
+        except ImportError:
+            raise SystemExit("--production needs gunicorn (Linux/macOS) or waitress: pip install gunicorn waitress")
+        print(f"[server] waitress: {threads} threads on {host}:{port}", flush=True)
+        serve(create_app(**app_kwargs), host=host, port=port, threads=threads)
+        return
+
+    if app_kwargs.get("prewarm_users") or os.getenv("PRELOAD_USERNAMES"):
+        create_app(**app_kwargs)
+        app_kwargs = {**app_kwargs, "prewarm_users": ""}
+        os.environ.pop("PRELOAD_USERNAMES", None)
+    call = ", ".join(f"{k}={v!r}" for k, v in app_kwargs.items())
+    argv = [
+        sys.executable, "-m", "gunicorn",
+        "--chdir", os.path.dirname(os.path.abspath(__file__)),
+        "-k", "gthread", "-w", str(workers), "--threads", str(threads),
+        "--bind", f"{host}:{port}",
+        f"main:create_app({call})",
+    ]
+    print(f"[server] exec gunicorn: {workers} workers x {threads} threads on {host}:{port}", flush=True)
+    os.execv(sys.executable, argv)
+
+
 # ---------- ENTRYPOINT ----------
 
 if __name__ == "__main__":
     (host, port, external_base_url, engine_name, tts_voice, tts_voice_index,
-     gtts_lang_code, gtts_tld, max_files) = parse_args()
+     gtts_lang_code, gtts_tld, max_files, prewarm_users, accel_redirect_prefix, x_sendfile,
+     synth_processes, max_age_minutes, espeak_voice, tts_workers,
+     piper_model, production, workers, threads) = parse_args()
 
-    app = create_app(
+    app_kwargs = dict(
         external_base_url=external_base_url,
         engine_name=engine_name,
         tts_voice=tts_voice,
@@ -495,5 +1853,18 @@ if __name__ == "__main__":
         gtts_lang_code=gtts_lang_code,
         gtts_tld=gtts_tld,
         max_files=max_files,
+        prewarm_users=prewarm_users,
+        accel_redirect_prefix=accel_redirect_prefix,
+        x_sendfile=x_sendfile,
+        synth_processes=synth_processes,
+        max_age_minutes=max_age_minutes,
+        espeak_voice=espeak_voice,
+        tts_workers=tts_workers,
+        piper_model=piper_model,
     )
+    if production:
+        run_production(host, port, workers, threads, app_kwargs)
+        sys.exit(0)
+
+    app = create_app(**app_kwargs)
     app.run(host=host, port=port, debug=False)
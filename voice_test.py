@@ -22,10 +22,8 @@ import pyttsx3
 
 # ---------- Helpers ----------
 
-def get_voice_gender(voice) -> str | None:
-    raw = getattr(voice, "gender", None)
-    vid = (getattr(voice, "id", "") or "").lower()
-    name = (getattr(voice, "name", "") or "").lower()
+def get_voice_gender(raw, vid: str, name: str) -> str | None:
+    """raw is the driver's gender attribute; vid/name must already be lowercased."""
 
     # If espeak reports "male" but there’s no clear marker, treat as unknown.
     if raw:
@@ -50,13 +48,13 @@ def get_voice_gender(voice) -> str | None:
     return None
 
 
-def speak_with_voice(voice_id: str, text: str, rate_delta: int = 0, volume: float | None = None) -> None:
-    """Init a fresh engine, set the voice, then speak."""
-    engine = pyttsx3.init()
+def speak_with_voice(engine, voice_id: str, text: str, rate_delta: int = 0, volume: float | None = None) -> None:
+    """Set the voice on an existing engine, then speak. Rate/volume are restored afterwards."""
+    prev_rate = engine.getProperty("rate") if rate_delta else None
+    prev_volume = engine.getProperty("volume") if volume is not None else None
     try:
         if rate_delta:
-            rate = engine.getProperty("rate") or 200
-            engine.setProperty("rate", rate + rate_delta)
+            engine.setProperty("rate", (prev_rate or 200) + rate_delta)
         if volume is not None:
             engine.setProperty("volume", max(0.0, min(1.0, volume)))
 
@@ -64,53 +62,71 @@ def speak_with_voice(voice_id: str, text: str, rate_delta: int = 0, volume: floa
         engine.say(text)
         engine.runAndWait()
     finally:
-        try:
-            engine.stop()
-        except Exception:
-            pass
-        del engine
+        if prev_rate is not None:
+            engine.setProperty("rate", prev_rate)
+        if prev_volume is not None:
+            engine.setProperty("volume", prev_volume)
+
+
+def _stop_engine(engine) -> None:
+    try:
+        engine.stop()
+    except Exception:
+        pass
+
 
+def list_and_test_all_voices(
+    sample_text: str = "Hello! This is my voice.",
+    play: bool = False,
+    reinit_per_voice: bool = False,
+) -> None:
+    """
+    List all voices, and optionally play a sample.
 
-def list_and_test_all_voices(sample_text: str = "Hello! This is my voice.", play: bool = False) -> None:
-    """List all voices, and optionally play a sample."""
-    probe = pyttsx3.init()
-    voices = probe.getProperty("voices")
+    One engine is shared for listing and playback. Set reinit_per_voice for
+    drivers that misbehave when the voice is switched on a live engine (e.g. NSSS).
+    """
+    engine = pyttsx3.init()
+    voices = engine.getProperty("voices")
     print(f"Found {len(voices)} voices.\n")
 
     # Gather metadata
     metadata = []
     for i, v in enumerate(voices):
+        vid = getattr(v, "id", "") or ""
+        name = getattr(v, "name", "") or ""
         meta = {
             "index": i,
-            "id": getattr(v, "id", ""),
-            "name": getattr(v, "name", ""),
+            "id": vid,
+            "name": name,
             "languages": getattr(v, "languages", []),
-            "gender": get_voice_gender(v),
+            "gender": get_voice_gender(getattr(v, "gender", None), vid.lower(), name.lower()),
         }
         metadata.append(meta)
 
-    try:
-        probe.stop()
-    except Exception:
-        pass
-    del probe
-
     # Display and optionally play
-    for m in metadata:
-        idx, vid, name, langs, gender = (
-            m["index"],
-            m["id"],
-            m["name"],
-            m["languages"],
-            m["gender"] or "Unknown",
-        )
-        print(f"[{idx}] {name} ({vid})  Gender: {gender}  Langs: {langs}")
-        if play:
-            try:
-                speak_with_voice(vid, sample_text)
-            except Exception as e:
-                print(f"  -> Skipped due to error: {e}")
-            time.sleep(0.3)
+    try:
+        for m in metadata:
+            idx, vid, name, langs, gender = (
+                m["index"],
+                m["id"],
+                m["name"],
+                m["languages"],
+                m["gender"] or "Unknown",
+            )
+            print(f"[{idx}] {name} ({vid})  Gender: {gender}  Langs: {langs}")
+            if play:
+                try:
+                    if reinit_per_voice:
+                        # pyttsx3.init() would hand back the same cached engine; build a new one.
+                        _stop_engine(engine)
+                        engine = pyttsx3.Engine()
+                    speak_with_voice(engine, vid, sample_text)
+                except Exception as e:
+                    print(f"  -> Skipped due to error: {e}")
+                time.sleep(0.3)
+    finally:
+        _stop_engine(engine)
 
     print("\nAll voices listed." if not play else "\nAll voices attempted.")
 
@@ -122,6 +138,8 @@ if __name__ == "__main__":
     parser.add_argument("--play", action="store_true", help="Play each voice sample aloud.")
     parser.add_argument("--text", type=str, default="Hello! This is a test of my voice.",
                         help="Sample text to use when playing voices.")
+    parser.add_argument("--reinit-per-voice", action="store_true",
+                        help="Create a fresh engine for every voice (for drivers that need it).")
     args = parser.parse_args()
 
-    list_and_test_all_voices(args.text, play=args.play)
+    list_and_test_all_voices(args.text, play=args.play, reinit_per_voice=args.reinit_per_voice)